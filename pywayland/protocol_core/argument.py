@@ -31,6 +31,19 @@ class classproperty:
         return self.f(owner)
 
 
+# Wire signature characters by argument type, NewId is handled separately
+# since its signature depends on whether an interface is given
+_SIGNATURES = {
+    ArgumentType.Int: "i",
+    ArgumentType.Uint: "u",
+    ArgumentType.Fixed: "f",
+    ArgumentType.String: "s",
+    ArgumentType.Object: "o",
+    ArgumentType.Array: "a",
+    ArgumentType.FileDescriptor: "h",
+}
+
+
 @dataclass(frozen=True)
 class Argument:
     argument_type: ArgumentType
@@ -39,25 +52,13 @@ class Argument:
 
     @property
     def signature(self) -> str:
-        if self.argument_type == ArgumentType.Int:
-            base_signature = "i"
-        elif self.argument_type == ArgumentType.Uint:
-            base_signature = "u"
-        elif self.argument_type == ArgumentType.Fixed:
-            base_signature = "f"
-        elif self.argument_type == ArgumentType.String:
-            base_signature = "s"
-        elif self.argument_type == ArgumentType.Object:
-            base_signature = "o"
-        elif self.argument_type == ArgumentType.NewId:
+        if self.argument_type == ArgumentType.NewId:
             if self.interface is None:
                 base_signature = "sun"
             else:
                 base_signature = "n"
-        elif self.argument_type == ArgumentType.Array:
-            base_signature = "a"
-        elif self.argument_type == ArgumentType.FileDescriptor:
-            base_signature = "h"
+        else:
+            base_signature = _SIGNATURES[self.argument_type]
 
         if self.nullable:
             return "?" + base_signature
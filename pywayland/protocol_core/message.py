@@ -15,13 +15,143 @@
 from __future__ import annotations
 
 from typing import Callable, Iterable
-from weakref import WeakKeyDictionary
 
 from pywayland import ffi, lib
 
 from .argument import Argument, ArgumentType
 
-weakkeydict: WeakKeyDictionary = WeakKeyDictionary()
+# Cache the compiled cdecls once, so the hot marshaling paths skip CFFI's
+# string-to-ctype lookup on every call
+_WL_OBJECT_P = ffi.typeof("struct wl_object *")
+_WL_ARG_ARR = ffi.typeof("union wl_argument []")
+_WL_INTERFACE_P_ARR = ffi.typeof("struct wl_interface* []")
+_WL_ARRAY_ARR = ffi.typeof("struct wl_array []")
+_CHAR_ARR = ffi.typeof("char []")
+_CHAR_P = ffi.typeof("char *")
+_UINTPTR_T = ffi.typeof("uintptr_t")
+
+# Hoisted enum members for the marshal loop, a module global is cheaper than
+# an attribute lookup on ArgumentType per argument
+_AT_NEWID = ArgumentType.NewId
+_AT_STRING = ArgumentType.String
+_AT_ARRAY = ArgumentType.Array
+
+
+def _c_to_string(arg_ptr, argument: Argument, message: Message):
+    if arg_ptr == ffi.NULL:
+        if not argument.nullable:
+            raise Exception
+        return None
+    return ffi.string(arg_ptr.s).decode()
+
+
+def _c_to_object(arg_ptr, argument: Argument, message: Message):
+    if arg_ptr.o == ffi.NULL:
+        if not argument.nullable:
+            raise RuntimeError(
+                "Got null object parsing arguments for '{}' message, may already be destroyed".format(
+                    message.name
+                )
+            )
+        return None
+    # the registry is keyed by the integer address of the proxy, ints hash
+    # faster than cdata objects
+    iface = argument.interface
+    obj = iface.registry.get(int(ffi.cast(_UINTPTR_T, arg_ptr.o)))
+    if obj is None:
+        raise RuntimeError(
+            f"Unable to get object for {arg_ptr.o}, was it garbage collected?"
+        )
+    return obj
+
+
+def _c_to_new_id(arg_ptr, argument: Argument, message: Message):
+    # TODO
+    raise NotImplementedError
+
+
+def _c_to_array(arg_ptr, argument: Argument, message: Message):
+    array_ptr = arg_ptr.a
+    return ffi.buffer(array_ptr.data, array_ptr.size)[:]
+
+
+# Handlers for building Python arguments from `union wl_argument` values,
+# keyed on the argument type for O(1) dispatch in the marshaling hot path
+_C_TO_ARG: dict[ArgumentType, Callable] = {
+    ArgumentType.Int: lambda arg_ptr, argument, message: arg_ptr.i,
+    ArgumentType.Uint: lambda arg_ptr, argument, message: arg_ptr.u,
+    ArgumentType.Fixed: lambda arg_ptr, argument, message: lib.wl_fixed_to_double(
+        arg_ptr.f
+    ),
+    ArgumentType.FileDescriptor: lambda arg_ptr, argument, message: arg_ptr.h,
+    ArgumentType.String: _c_to_string,
+    ArgumentType.Object: _c_to_object,
+    ArgumentType.NewId: _c_to_new_id,
+    ArgumentType.Array: _c_to_array,
+}
+
+
+def _set_int(args_ptr, i: int, arg, argument: Argument, refs: list) -> None:
+    args_ptr[i].i = arg
+
+
+def _set_uint(args_ptr, i: int, arg, argument: Argument, refs: list) -> None:
+    args_ptr[i].u = arg
+
+
+def _set_fixed(args_ptr, i: int, arg, argument: Argument, refs: list) -> None:
+    if isinstance(arg, int):
+        args_ptr[i].f = lib.wl_fixed_from_int(arg)
+    else:
+        args_ptr[i].f = lib.wl_fixed_from_double(arg)
+
+
+def _set_file_descriptor(args_ptr, i: int, arg, argument: Argument, refs: list) -> None:
+    args_ptr[i].h = arg
+
+
+def _set_object(args_ptr, i: int, arg, argument: Argument, refs: list) -> None:
+    if arg is None:
+        if not argument.nullable:
+            raise Exception
+        new_arg = ffi.NULL
+    else:
+        new_arg = ffi.cast(_WL_OBJECT_P, arg._ptr)
+        refs.append(new_arg)
+    args_ptr[i].o = new_arg
+
+
+# Handlers for filling `union wl_argument` values from Python arguments,
+# NewId, String and Array arguments are special-cased in
+# :meth:`Message.arguments_to_c`
+_TO_C: dict[ArgumentType, Callable] = {
+    ArgumentType.Int: _set_int,
+    ArgumentType.Uint: _set_uint,
+    ArgumentType.Fixed: _set_fixed,
+    ArgumentType.FileDescriptor: _set_file_descriptor,
+    ArgumentType.Object: _set_object,
+}
+
+# Statement templates for the specialized marshal functions, the remaining
+# argument types are emitted by hand in _compile_marshal_fn or fall back to
+# the generic arguments_to_c loop
+_MARSHAL_TEMPLATES = {
+    ArgumentType.Int: "    args_ptr[{i}].i = {arg}",
+    ArgumentType.Uint: "    args_ptr[{i}].u = {arg}",
+    ArgumentType.FileDescriptor: "    args_ptr[{i}].h = {arg}",
+    ArgumentType.Fixed: (
+        "    args_ptr[{i}].f = (\n"
+        "        lib.wl_fixed_from_int({arg})\n"
+        "        if isinstance({arg}, int)\n"
+        "        else lib.wl_fixed_from_double({arg})\n"
+        "    )"
+    ),
+    ArgumentType.NewId: "    args_ptr[{i}].o = ffi.NULL",
+}
+
+# Marshaling state shared between messages with the same argument list and
+# version, e.g. every destroy() request across all interfaces
+_plan_cache: dict[tuple, tuple] = {}
 
 
 class Message:
@@ -55,6 +185,139 @@ class Message:
         self.arguments = arguments
         self.version = version
 
+        # Messages with the same argument list and version share their
+        # precomputed marshaling state, so identical-shape messages across
+        # interfaces reuse one plan and generated marshal function
+        key = (tuple(arguments), version)
+        cached = _plan_cache.get(key)
+        if cached is None:
+            self._build_marshal_state()
+            _plan_cache[key] = (
+                self._marshal_plan,
+                self._marshal_nargs,
+                self._marshal_types,
+                self._signature_encoded,
+                self._marshal_fn,
+                self._from_c_plan,
+                self._to_c_plan,
+            )
+        else:
+            (
+                self._marshal_plan,
+                self._marshal_nargs,
+                self._marshal_types,
+                self._signature_encoded,
+                self._marshal_fn,
+                self._from_c_plan,
+                self._to_c_plan,
+            ) = cached
+
+        # the cdata for the name and signature is built on the first
+        # build_message_struct call
+        self._name_cdata = None
+        self._signature_cdata = None
+
+    def _build_marshal_state(self) -> None:
+        """Precompute the marshaling state for this message
+
+        Builds the marshaled argument plan so that every call to
+        arguments_to_c does not have to rebuild it, encodes the wire
+        signature, generates the specialized marshal function and pairs each
+        argument with its handler up front so the marshal loops avoid the
+        per-call dict and attribute lookups.
+        """
+        self._marshal_plan = tuple(self._marshaled_arguments)
+        self._marshal_nargs = len(self._marshal_plan)
+        self._marshal_types = tuple(arg.argument_type for arg in self._marshal_plan)
+
+        signature = "".join(argument.signature for argument in self.arguments)
+        if self.version is not None:
+            signature = f"{self.version}{signature}"
+        self._signature_encoded = signature.encode()
+
+        self._marshal_fn = self._compile_marshal_fn()
+
+        self._from_c_plan = tuple(
+            (_C_TO_ARG[argument.argument_type], argument)
+            for argument in self.arguments
+        )
+        self._to_c_plan = tuple(
+            (argument_type, _TO_C.get(argument_type), argument)
+            for argument_type, argument in zip(self._marshal_types, self._marshal_plan)
+        )
+
+    def _compile_marshal_fn(self) -> Callable | None:
+        """Generate a specialized marshal function for this message
+
+        Generates a function that hard-codes the wl_argument assignments for
+        the exact signature of this message, skipping the per-argument
+        dispatch of the generic loop.  Non-nullable strings and objects are
+        specialized as well, including the single shared string buffer and
+        the refs bookkeeping.  Returns None for signatures with nullable
+        strings or objects, or with arrays, which take the generic path.
+        """
+        encode_lines = []
+        lines = []
+        tail_lines = []
+        params = []
+        strings = []
+        has_refs = False
+        for i, argument in enumerate(self._marshal_plan):
+            argument_type = argument.argument_type
+            if argument_type is _AT_NEWID:
+                lines.append(_MARSHAL_TEMPLATES[argument_type].format(i=i))
+                continue
+            arg = f"arg{len(params)}"
+            params.append(arg)
+            if argument_type is _AT_STRING and not argument.nullable:
+                encode_lines.append(f"    enc{i} = {arg}.encode()")
+                strings.append(i)
+            elif argument_type is ArgumentType.Object and not argument.nullable:
+                lines.append(f"    obj{i} = ffi.cast(_WL_OBJECT_P, {arg}._ptr)")
+                lines.append(f"    refs.append(obj{i})")
+                lines.append(f"    args_ptr[{i}].o = obj{i}")
+                has_refs = True
+            else:
+                template = _MARSHAL_TEMPLATES.get(argument_type)
+                if template is None:
+                    return None
+                lines.append(template.format(i=i, arg=arg))
+
+        if strings:
+            has_refs = True
+            size = " + ".join(f"len(enc{i})" for i in strings)
+            tail_lines.append(f"    buf = ffi.new(_CHAR_ARR, {size} + {len(strings)})")
+            tail_lines.append("    base = ffi.cast(_CHAR_P, buf)")
+            tail_lines.append("    offset = 0")
+            for i in strings:
+                tail_lines.append(f"    args_ptr[{i}].s = base + offset")
+                tail_lines.append(f"    ffi.memmove(base + offset, enc{i}, len(enc{i}))")
+                tail_lines.append(f"    offset += len(enc{i}) + 1")
+            tail_lines.append("    refs.append(buf)")
+
+        body = [f"    args_ptr = ffi.new(_WL_ARG_ARR, {self._marshal_nargs})"]
+        if has_refs:
+            body.append("    refs = []")
+        body.extend(encode_lines)
+        body.extend(lines)
+        body.extend(tail_lines)
+        if has_refs:
+            body.append("    return args_ptr, refs")
+        else:
+            body.append("    return args_ptr, None")
+
+        source = "def _marshal({}):\n{}\n".format(", ".join(params), "\n".join(body))
+        namespace = {
+            "ffi": ffi,
+            "lib": lib,
+            "_WL_ARG_ARR": _WL_ARG_ARR,
+            "_WL_OBJECT_P": _WL_OBJECT_P,
+            "_CHAR_ARR": _CHAR_ARR,
+            "_CHAR_P": _CHAR_P,
+        }
+        exec(source, namespace)
+        return namespace["_marshal"]
+
     @property
     def _marshaled_arguments(self) -> Iterable[Argument]:
         for arg in self.arguments:
@@ -72,20 +335,18 @@ class Message:
             A tuple of elements which must be kept alive for the message struct
             to remain valid.
         """
-        signature = "".join(argument.signature for argument in self.arguments)
-        if self.version is not None:
-            signature = f"{self.version}{signature}"
+        if self._name_cdata is None:
+            self._name_cdata = ffi.new(_CHAR_ARR, self.name.encode())
+            self._signature_cdata = ffi.new(_CHAR_ARR, self._signature_encoded)
 
-        wl_message_struct.name = name = ffi.new("char[]", self.name.encode())
-        wl_message_struct.signature = cdata_signature = ffi.new(
-            "char[]", signature.encode()
-        )
+        wl_message_struct.name = name = self._name_cdata
+        wl_message_struct.signature = cdata_signature = self._signature_cdata
 
         wl_message_struct.types = types = ffi.new(
-            "struct wl_interface* []", len(list(self._marshaled_arguments))
+            _WL_INTERFACE_P_ARR, self._marshal_nargs
         )
 
-        for index, argument in enumerate(self._marshaled_arguments):
+        for index, argument in enumerate(self._marshal_plan):
             if argument.interface is None:
                 types[index] = ffi.NULL
             else:
@@ -105,56 +366,10 @@ class Message:
         :type args_ptr: cdata `union wl_argument []`
         :returns: list of args
         """
-        args = []
-        for i, argument in enumerate(self.arguments):
-            arg_ptr = args_ptr[i]
-
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args.append(arg_ptr.i)
-            elif argument.argument_type == ArgumentType.Uint:
-                args.append(arg_ptr.u)
-            elif argument.argument_type == ArgumentType.Fixed:
-                f = lib.wl_fixed_to_double(arg_ptr.f)
-                args.append(f)
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args.append(arg_ptr.h)
-            elif argument.argument_type == ArgumentType.String:
-                if arg_ptr == ffi.NULL:
-                    if not argument.nullable:
-                        raise Exception
-                    args.append(None)
-                else:
-                    args.append(ffi.string(arg_ptr.s).decode())
-            elif argument.argument_type == ArgumentType.Object:
-                if arg_ptr.o == ffi.NULL:
-                    if not argument.nullable:
-                        message = "Got null object parsing arguments for '{}' message, may already be destroyed".format(
-                            self.name
-                        )
-                        raise RuntimeError(message)
-                    args.append(None)
-                else:
-                    iface = argument.interface
-                    proxy_ptr = ffi.cast("struct wl_proxy *", arg_ptr.o)
-                    obj = iface.registry.get(proxy_ptr)
-                    if obj is None:
-                        raise RuntimeError(
-                            "Unable to get object for {}, was it garbage collected?".format(
-                                proxy_ptr
-                            )
-                        )
-                    args.append(obj)
-            elif argument.argument_type == ArgumentType.NewId:
-                # TODO
-                raise NotImplementedError
-            elif argument.argument_type == ArgumentType.Array:
-                array_ptr = arg_ptr.a
-                args.append(ffi.buffer(array_ptr.data, array_ptr.size)[:])
-            else:
-                raise Exception(f"Bad argument: {argument}")
-
-        return args
+        return [
+            handler(args_ptr[i], argument, self)
+            for i, (handler, argument) in enumerate(self._from_c_plan)
+        ]
 
     def arguments_to_c(self, *args):
         """Create an array of `wl_argument` C structs
@@ -164,62 +379,67 @@ class Message:
 
         :param args: Input arguments
         :type args: `list`
-        :returns: cdata `union wl_argument []` of args
+        :returns: Tuple of the cdata `union wl_argument []` of args and the
+            objects that must be kept alive while the array is in use
         """
-        nargs = len(list(self._marshaled_arguments))
-        args_ptr = ffi.new("union wl_argument []", nargs)
+        if self._marshal_fn is not None:
+            return self._marshal_fn(*args)
+
+        args_ptr = ffi.new(_WL_ARG_ARR, self._marshal_nargs)
 
         arg_iter = iter(args)
         refs = []
-        for i, argument in enumerate(self._marshaled_arguments):
+        strings: list[tuple[int, bytes]] = []
+        arrays: list[tuple[int, bytes]] = []
+        for i, (argument_type, handler, argument) in enumerate(self._to_c_plan):
             # New id (set to null for now, will be assigned on marshal)
             # Then, continue so we don't consume an arg
-            if argument.argument_type == ArgumentType.NewId:
+            if argument_type is _AT_NEWID:
                 args_ptr[i].o = ffi.NULL
                 continue
 
             arg = next(arg_iter)
-            # Match numbers (int, unsigned, float, file descriptor)
-            if argument.argument_type == ArgumentType.Int:
-                args_ptr[i].i = arg
-            elif argument.argument_type == ArgumentType.Uint:
-                args_ptr[i].u = arg
-            elif argument.argument_type == ArgumentType.Fixed:
-                if isinstance(arg, int):
-                    f = lib.wl_fixed_from_int(arg)
-                else:
-                    f = lib.wl_fixed_from_double(arg)
-                args_ptr[i].f = f
-            elif argument.argument_type == ArgumentType.FileDescriptor:
-                args_ptr[i].h = arg
-            elif argument.argument_type == ArgumentType.String:
+            if argument_type is _AT_STRING:
                 if arg is None:
                     if not argument.nullable:
                         raise Exception
-                    new_arg = ffi.NULL
+                    args_ptr[i].s = ffi.NULL
                 else:
-                    new_arg = ffi.new("char []", arg.encode())
-                    refs.append(new_arg)
-                args_ptr[i].s = new_arg
-            elif argument.argument_type == ArgumentType.Object:
-                if arg is None:
-                    if not argument.nullable:
-                        raise Exception
-                    new_arg = ffi.NULL
-                else:
-                    new_arg = ffi.cast("struct wl_object *", arg._ptr)
-                    refs.append(new_arg)
-                args_ptr[i].o = new_arg
-            elif argument.argument_type == ArgumentType.Array:
-                # TODO: this is a bit messy, we probably don't want to put everything in one buffer like this
-                new_arg = ffi.new("struct wl_array *")
-                new_data = ffi.new("void []", len(arg))
-                new_arg.alloc = new_arg.size = len(arg)
-                ffi.buffer(new_data)[:] = arg
-                refs.append(new_arg)
-                refs.append(new_data)
-
-        if len(refs) > 0:
-            weakkeydict[args_ptr] = tuple(refs)
-
-        return args_ptr
+                    strings.append((i, arg.encode()))
+            elif argument_type is _AT_ARRAY:
+                arrays.append((i, arg))
+            else:
+                handler(args_ptr, i, arg, argument, refs)
+
+        # Pack all string arguments into one zero-initialized buffer, so a
+        # multi-string message costs a single allocation; the terminating null
+        # byte after each string is left from the initial allocation
+        if strings:
+            buf = ffi.new(
+                _CHAR_ARR, sum(len(encoded) for _, encoded in strings) + len(strings)
+            )
+            base = ffi.cast(_CHAR_P, buf)
+            offset = 0
+            for i, encoded in strings:
+                args_ptr[i].s = base + offset
+                ffi.memmove(base + offset, encoded, len(encoded))
+                offset += len(encoded) + 1
+            refs.append(buf)
+
+        # Same for array arguments: one buffer for the payloads and a single
+        # allocation for the wl_array headers
+        if arrays:
+            headers = ffi.new(_WL_ARRAY_ARR, len(arrays))
+            data = ffi.new(_CHAR_ARR, sum(len(arg) for _, arg in arrays))
+            base = ffi.cast(_CHAR_P, data)
+            offset = 0
+            for index, (i, arg) in enumerate(arrays):
+                headers[index].alloc = headers[index].size = len(arg)
+                headers[index].data = base + offset
+                ffi.memmove(base + offset, arg, len(arg))
+                args_ptr[i].a = headers + index
+                offset += len(arg)
+            refs.append(headers)
+            refs.append(data)
+
+        return args_ptr, refs
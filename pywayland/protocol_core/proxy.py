@@ -18,7 +18,6 @@ from typing import TYPE_CHECKING, Generic, TypeVar
 
 from pywayland import ffi, lib
 from pywayland.dispatcher import Dispatcher
-from pywayland.utils import ensure_valid
 
 if TYPE_CHECKING:
     from .interface import Interface
@@ -28,6 +27,10 @@ if TYPE_CHECKING:
 else:
     T = TypeVar("T")
 
+# Cache the compiled cdecls once, every proxy creation and marshal casts to them
+_WL_PROXY_P = ffi.typeof("struct wl_proxy *")
+_UINTPTR_T = ffi.typeof("uintptr_t")
+
 
 class Proxy(Generic[T]):
     interface: type[T]
@@ -65,7 +68,7 @@ class Proxy(Generic[T]):
 
         # note that even though we cast to a proxy here, the ptr may be a
         # wl_display, so the methods must still cast to 'struct wl_proxy *'
-        ptr = ffi.cast("struct wl_proxy *", ptr)
+        ptr = ffi.cast(_WL_PROXY_P, ptr)
         self._ptr = ffi.gc(ptr, lib.wl_proxy_destroy)
 
         self._handle = ffi.new_handle(self)
@@ -73,7 +76,9 @@ class Proxy(Generic[T]):
             self._ptr, lib.dispatcher_func, self._handle, ffi.NULL
         )
 
-        self.interface.registry[self._ptr] = self
+        # key the registry by the integer address, matching the lookup done
+        # when resolving object arguments of incoming events
+        self.interface.registry[int(ffi.cast(_UINTPTR_T, self._ptr))] = self
 
     @property
     def destroyed(self) -> bool:
@@ -94,25 +99,34 @@ class Proxy(Generic[T]):
 
     destroy = _destroy
 
-    @ensure_valid
     def _marshal(self, opcode, *args) -> None:
         """Marshal the given arguments into the Wayland wire format"""
-        # Create a wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
+        # Checked inline rather than with @ensure_valid, this path runs on
+        # every request and the decorator adds a forwarding frame per call
+        if self._ptr is None:
+            raise ValueError(f"{self.__class__.__name__} object has been destroyed")
+
+        # Create a wl_argument array, refs must stay alive until the wire
+        # copy below is done
+        args_ptr, refs = self.interface.requests[opcode].arguments_to_c(*args)
 
         # Write the event into the connection queue
-        proxy = ffi.cast("struct wl_proxy *", self._ptr)
+        proxy = ffi.cast(_WL_PROXY_P, self._ptr)
         lib.wl_proxy_marshal_array(proxy, opcode, args_ptr)
 
     def _marshal_constructor(
         self, opcode: int, interface: type[InterfaceT], *args
     ) -> Proxy[InterfaceT]:
         """Marshal the given arguments into the Wayland wire format for a constructor"""
-        # Create a wl_argument array
-        args_ptr = self.interface.requests[opcode].arguments_to_c(*args)
+        if self._ptr is None:
+            raise ValueError(f"{self.__class__.__name__} object has been destroyed")
+
+        # Create a wl_argument array, refs must stay alive until the wire
+        # copy below is done
+        args_ptr, refs = self.interface.requests[opcode].arguments_to_c(*args)
 
         # Write the event into the connection queue and build a new proxy from the given args
-        proxy = ffi.cast("struct wl_proxy *", self._ptr)
+        proxy = ffi.cast(_WL_PROXY_P, self._ptr)
         proxy_ptr = lib.wl_proxy_marshal_array_constructor(
             proxy, opcode, args_ptr, interface._ptr
         )
@@ -93,8 +93,9 @@ class Resource(Generic[T]):
 
     @ensure_valid
     def _post_event(self, opcode, *args) -> None:
-        # Create wl_argument array
-        args_ptr = self.interface.events[opcode].arguments_to_c(*args)
+        # Create wl_argument array, refs must stay alive until the event is
+        # posted below
+        args_ptr, refs = self.interface.events[opcode].arguments_to_c(*args)
         # Make the cast to a wl_resource
         assert self._ptr is not None
         resource: ffi.ResourceCData = ffi.cast("struct wl_resource *", self._ptr)  # type: ignore[assignment]
@@ -17,6 +17,7 @@ from __future__ import annotations
 import enum
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
+from functools import cached_property
 
 from .description import Description
 from .element import Element
@@ -37,6 +38,19 @@ class ArgumentType(enum.Enum):
     FileDescriptor = enum.auto()
 
 
+# Argument types by the type attribute used in the protocol XML
+_ARGUMENT_TYPES = {
+    "int": ArgumentType.Int,
+    "uint": ArgumentType.Uint,
+    "fixed": ArgumentType.Fixed,
+    "string": ArgumentType.String,
+    "object": ArgumentType.Object,
+    "new_id": ArgumentType.NewId,
+    "array": ArgumentType.Array,
+    "fd": ArgumentType.FileDescriptor,
+}
+
+
 @dataclass(frozen=True)
 class Argument(Element):
     """Argument to a request or event method
@@ -59,24 +73,10 @@ class Argument(Element):
     @classmethod
     def parse(cls, element: ET.Element) -> Argument:
         arg_type_str = cls.parse_attribute(element, "type")
-        if arg_type_str == "int":
-            argument_type = ArgumentType.Int
-        elif arg_type_str == "uint":
-            argument_type = ArgumentType.Uint
-        elif arg_type_str == "fixed":
-            argument_type = ArgumentType.Fixed
-        elif arg_type_str == "string":
-            argument_type = ArgumentType.String
-        elif arg_type_str == "object":
-            argument_type = ArgumentType.Object
-        elif arg_type_str == "new_id":
-            argument_type = ArgumentType.NewId
-        elif arg_type_str == "array":
-            argument_type = ArgumentType.Array
-        elif arg_type_str == "fd":
-            argument_type = ArgumentType.FileDescriptor
-        else:
-            raise ValueError(f"Invalid argument type: {arg_type_str}")
+        try:
+            argument_type = _ARGUMENT_TYPES[arg_type_str]
+        except KeyError:
+            raise ValueError(f"Invalid argument type: {arg_type_str}") from None
 
         allow_null = cls.parse_optional_attribute(element, "allow-null") == "true"
         return cls(
@@ -89,7 +89,7 @@ class Argument(Element):
             description=cls.parse_optional_child(element, Description, "description"),
         )
 
-    @property
+    @cached_property
     def interface_class(self) -> str:
         """Returns the Interface class name
 
@@ -99,7 +99,7 @@ class Argument(Element):
         assert self.interface is not None
         return "".join(x.capitalize() for x in self.interface.split("_"))
 
-    @property
+    @cached_property
     def signature(self) -> str:
         """Output as the argument appears in the signature."""
         return f"{self.name}: {self._annotation}"
@@ -16,6 +16,7 @@ from __future__ import annotations
 
 import xml.etree.ElementTree as ET
 from dataclasses import dataclass
+from functools import cached_property
 
 from .description import Description
 from .element import Element
@@ -49,21 +50,27 @@ class Entry(Element):
             description=cls.parse_optional_child(element, Description, "description"),
         )
 
-    def output(self, enum_name: str, printer: Printer) -> None:
-        """Generate the output for the entry in the enum"""
+    @cached_property
+    def _value_output(self) -> str:
         # keep base 10 ints unchanged, but ensure that hexidecimal ints are
         # formatted 0xABC
         if self.value[:2] == "0x":
-            value = f"0x{self.value[2:].upper()}"
-        else:
-            value = self.value
+            return f"0x{self.value[2:].upper()}"
+        return self.value
+
+    @cached_property
+    def _numeric_name(self) -> bool:
+        return self.name.isdigit()
 
-        try:
-            int(self.name)
-            printer(f"{enum_name}_{self.name} = {value}")
-        except ValueError:
-            if self.name in ("name", "async"):
-                name = self.name + "_"
-            else:
-                name = self.name
-            printer(f"{name} = {value}")
+    @cached_property
+    def _name_output(self) -> str:
+        if self.name in ("name", "async"):
+            return self.name + "_"
+        return self.name
+
+    def output(self, enum_name: str, printer: Printer) -> None:
+        """Generate the output for the entry in the enum"""
+        if self._numeric_name:
+            printer(f"{enum_name}_{self.name} = {self._value_output}")
+        else:
+            printer(f"{self._name_output} = {self._value_output}")
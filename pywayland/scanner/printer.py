@@ -17,6 +17,7 @@ from __future__ import annotations
 import contextlib
 import re
 import textwrap
+from functools import lru_cache
 from typing import BinaryIO, Iterator, Mapping, Match
 
 HEAD_MSG = "# This file has been autogenerated by the pywayland scanner"
@@ -33,6 +34,17 @@ DOC_WIDTH = 79
 TAB_STOP = 4
 
 
+@lru_cache()
+def _compile_doc_pattern(interface_names: str) -> re.Pattern:
+    """Compile the docstring cross-reference pattern
+
+    Every printer of a protocol builds the pattern from the same interface
+    names, memoize the compile so it runs once per protocol rather than once
+    per interface.
+    """
+    return re.compile(RE_DOC.format(interface_names))
+
+
 class Printer:
     def __init__(
         self,
@@ -64,7 +76,7 @@ class Printer:
         self._re_doc = None
         if interface_imports is not None:
             interface_names = "|".join(sorted(interface_imports, key=len, reverse=True))
-            self._re_doc = re.compile(RE_DOC.format(interface_names))
+            self._re_doc = _compile_doc_pattern(interface_names)
 
     def __call__(self, new_line: str | None = None) -> None:
         """Add the new line to the printer
@@ -206,11 +218,9 @@ class Printer:
             and interface_name in self._interface_imports
         ):
             protocol_path = self._interface_imports[interface_name]
-            return ":func:`{class_name}{func}() <{base_path}.{iface}.{class_name}{func}>`".format(
-                class_name=interface_class,
-                func=function_name,
-                base_path=BASE_PATH,
-                iface=protocol_path,
+            return (
+                f":func:`{interface_class}{function_name}() "
+                f"<{BASE_PATH}.{protocol_path}.{interface_class}{function_name}>`"
             )
 
         return f"`{interface_class}{function_name}()`"
@@ -224,6 +234,6 @@ class Printer:
 
     def write(self, f: BinaryIO) -> None:
         """Write the lines added to the printer out to the given file"""
-        for line in self._lines:
-            f.write(line.encode())
-            f.write(b"\n")
+        # join and encode the output in one shot rather than per line
+        f.write("\n".join(self._lines).encode())
+        f.write(b"\n")
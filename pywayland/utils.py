@@ -36,8 +36,9 @@ class AnonymousFile:
     """Anonymous file object
 
     Provides access to anonymous file objects that can be used by Wayland
-    clients to render to surfaces.  Uses a method similar to Weston to open an
-    anonymous file, so XDG_RUNTIME_DIR must be set for this to work properly.
+    clients to render to surfaces.  Uses ``memfd_create`` when available,
+    otherwise falls back to a method similar to Weston to open an anonymous
+    file, in which case XDG_RUNTIME_DIR must be set for this to work properly.
 
     This class provides a content manager, that is, it can be used with Python
     ``with`` statements, where the value returned is the file descriptor.
@@ -60,13 +61,24 @@ class AnonymousFile:
         """Open an anonymous file
 
         Opens the anonymous file and sets the ``fd`` property to the file
-        descriptor that has been opened.
+        descriptor that has been opened.  Uses :func:`os.memfd_create` where
+        available, which needs neither ``XDG_RUNTIME_DIR`` nor any filesystem
+        access, and falls back to the Weston-style temporary file otherwise.
         """
         if self.fd is not None:
             raise OSError("File is already open")
-        self.fd = lib.os_create_anonymous_file(self.size)
-        if self.fd < 0:
-            raise OSError("Unable to create anonymous file")
+        if hasattr(os, "memfd_create"):
+            fd = os.memfd_create("pywayland-shm", os.MFD_CLOEXEC)
+            try:
+                os.ftruncate(fd, self.size)
+            except OSError:
+                os.close(fd)
+                raise
+        else:
+            fd = lib.os_create_anonymous_file(self.size)
+            if fd < 0:
+                raise OSError("Unable to create anonymous file")
+        self.fd = fd
 
     def close(self) -> None:
         """Close the anonymous file